@@ -1,62 +1,195 @@
 import os
+import importlib.util
+import multiprocessing
+import functools
+import itertools
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from tkinter import ttk
 
-def combine_excel_files(directory, progress_bar):
-    # Lista para armazenar os DataFrames de cada planilha
-    data_frames = []
+# Leitor em Rust (calamine) quando disponível; senão o padrão do pandas (openpyxl)
+READ_ENGINE = 'calamine' if importlib.util.find_spec('python_calamine') else None
+# xlsxwriter grava mais rápido e com menos memória que o openpyxl
+WRITE_ENGINE = 'xlsxwriter' if importlib.util.find_spec('xlsxwriter') else None
+# Colunas em Arrow (strings contíguas) quando o pyarrow estiver instalado
+READ_OPTIONS = {'dtype_backend': 'pyarrow'} if pa is not None else {}
 
+SHEET_NAME = 'Sheet1' #Adequar com a sheet de cada planilha.
+
+def sheet_names(file_path):
+    # Lê só o xl/workbook.xml do zip, sem carregar estilos nem as planilhas
+    names = []
+    with zipfile.ZipFile(file_path) as z, z.open('xl/workbook.xml') as f:
+        for _, elem in ET.iterparse(f):
+            if elem.tag.endswith('}sheet'):
+                names.append(elem.get('name'))
+            elif elem.tag.endswith('}sheets'):
+                # A lista de sheets acabou; o resto (definedNames etc.) não interessa
+                break
+    return names
+
+def read_one(file_path, as_text=False, columns=None):
+    # Lê uma planilha; roda em um processo separado do pool
+    # Arquivos sem a sheet desejada são pulados (retorna None)
+    if SHEET_NAME not in sheet_names(file_path):
+        return None
+
+    # Como texto: sem inferência de tipos nem varredura de NA (células vazias viram '')
+    options = {'dtype': str, 'na_filter': False} if as_text else READ_OPTIONS
+    if columns:
+        # Só materializa as colunas pedidas; as que faltarem no arquivo são ignoradas
+        # (str: cabeçalhos numéricos ou de data também precisam casar com o texto digitado)
+        options = dict(options, usecols=lambda col: str(col).strip() in columns)
+    return pd.read_excel(file_path, sheet_name=SHEET_NAME, engine=READ_ENGINE, **options)
+
+def safe_concat(data_frames):
+    if not data_frames:
+        raise ValueError("Nenhuma planilha encontrada para combinar.")
+
+    # Caso comum: todas as planilhas têm as mesmas colunas; nada a unir nem reindexar
+    schema = tuple(data_frames[0].columns)
+    if all(tuple(df.columns) == schema for df in data_frames):
+        return pd.concat(data_frames, ignore_index=True)
+
+    # Com pyarrow: concat_tables só junta os blocos; colunas ausentes viram nulos
+    if pa is not None:
+        try:
+            tables = [pa.Table.from_pandas(df, preserve_index=False) for df in data_frames]
+            combined = pa.concat_tables(tables, promote_options='permissive')
+            return combined.to_pandas(types_mapper=pd.ArrowDtype)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Tipos incompatíveis entre planilhas (ex.: número x texto); segue pelo numpy
+            pass
+
+    # União das colunas, preservando a ordem em que aparecem (dict.fromkeys roda em C)
+    all_cols = list(dict.fromkeys(itertools.chain.from_iterable(df.columns for df in data_frames)))
+
+    # Um único bloco preenchido com NaN; cada planilha é copiada nas suas colunas
+    col_pos = {col: i for i, col in enumerate(all_cols)}
+    total_rows = sum(len(df) for df in data_frames)
+    values = np.full((total_rows, len(all_cols)), np.nan, dtype=object)
+    row = 0
+    for df in data_frames:
+        positions = [col_pos[col] for col in df.columns]
+        values[row:row + len(df), positions] = df.to_numpy(dtype=object, na_value=np.nan)
+        row += len(df)
+
+    return pd.DataFrame(values, columns=all_cols).infer_objects()
+
+def list_excel_files(directory):
+    # scandir já traz o tipo da entrada, sem um stat extra por arquivo
+    with os.scandir(directory) as entries:
+        return [e.path for e in entries if e.name.endswith('.xlsx') and e.is_file()]
+
+def combine_excel_files(directory, progress_bar, parquet=False, as_text=False, columns=None):
     # Obter a lista de arquivos Excel no diretório
-    files = [f for f in os.listdir(directory) if f.endswith('.xlsx')]
+    files = list_excel_files(directory)
     total_files = len(files)
 
-    # Loop através de todos os arquivos no diretório
-    for i, filename in enumerate(files):
-        file_path = os.path.join(directory, filename)
-        df = pd.read_excel(file_path, sheet_name='Sheet1') #Adequar com a sheet de cada planilha.
-        data_frames.append(df)
+    # Lista já no tamanho final para armazenar os DataFrames de cada planilha
+    data_frames = [None] * total_files
+
+    # Ler os arquivos em paralelo, um processo por núcleo (map mantém a ordem)
+    # No Windows o ProcessPoolExecutor aceita no máximo 61 processos
+    last_update = time.monotonic()
+    workers = min(os.cpu_count() or 1, 61, total_files or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        reader = functools.partial(read_one, as_text=as_text, columns=columns)
+        for i, df in enumerate(executor.map(reader, files)):
+            data_frames[i] = df
 
-        # Atualizar a barra de progresso
-        progress_bar['value'] = ((i + 1) / total_files) * 100
-        root.update_idletasks()
+            # Atualizar a barra de progresso no máximo a cada 100 ms (e no último arquivo)
+            now = time.monotonic()
+            if now - last_update >= 0.1 or i + 1 == total_files:
+                progress_bar['value'] = ((i + 1) / total_files) * 100
+                root.update_idletasks()
+                last_update = now
 
-    # Concatenar todos os DataFrames em um único DataFrame
-    combined_df = pd.concat(data_frames, ignore_index=True)
+    # Arquivos pulados por não terem a sheet desejada
+    skipped = [os.path.basename(f) for f, df in zip(files, data_frames) if df is None]
+
+    # Concatenar todos os DataFrames em um único DataFrame (sem os arquivos pulados)
+    combined_df = safe_concat([df for df in data_frames if df is not None])
+    if columns and combined_df.columns.empty:
+        raise ValueError("Nenhuma das colunas informadas foi encontrada nas planilhas.")
     
+    # Saída rápida: Parquet é muito mais rápido de gravar e bem menor que xlsx
+    if parquet:
+        save_path = os.path.join(directory, 'planilha_combinada.parquet')
+        # Parquet exige um tipo por coluna: colunas com número e texto misturados viram texto
+        for col in combined_df.columns:
+            if (combined_df[col].dtype == object
+                    and pd.api.types.infer_dtype(combined_df[col], skipna=True).startswith('mixed')):
+                combined_df[col] = combined_df[col].astype('string')
+        combined_df.to_parquet(save_path, index=False)
+        return save_path, skipped
+
     # Caminho para salvar a planilha combinada no diretório selecionado
     save_path = os.path.join(directory, 'planilha_combinada.xlsx')
     
     # Salvar o DataFrame combinado em uma nova planilha
-    combined_df.to_excel(save_path, index=False)
+    combined_df.to_excel(save_path, index=False, engine=WRITE_ENGINE)
 
-    return save_path
+    return save_path, skipped
 
 def select_directory():
     directory = filedialog.askdirectory()
     if directory:
         try:
             progress_bar['value'] = 0
-            save_path = combine_excel_files(directory, progress_bar)
-            messagebox.showinfo("Sucesso", f"As planilhas foram combinadas com sucesso!\nSalvo em: {save_path}")
+            columns = {c.strip() for c in columns_entry.get().split(',') if c.strip()}
+            save_path, skipped = combine_excel_files(directory, progress_bar, parquet_var.get(), text_var.get(), columns)
+            message = f"As planilhas foram combinadas com sucesso!\nSalvo em: {save_path}"
+            if skipped:
+                message += f"\n\n{len(skipped)} arquivo(s) sem a sheet '{SHEET_NAME}' foram ignorados:\n"
+                message += "\n".join(skipped[:10])
+                if len(skipped) > 10:
+                    message += f"\n... e mais {len(skipped) - 10}"
+            messagebox.showinfo("Sucesso", message)
         except Exception as e:
             messagebox.showerror("Erro", f"Ocorreu um erro ao combinar as planilhas:\n{e}")
 
-# Configurar a interface gráfica
-root = tk.Tk()
-root.title("Combinar Planilhas Excel")
+if __name__ == '__main__':
+    # Necessário para o pool de processos em executáveis congelados (Windows)
+    multiprocessing.freeze_support()
+
+    # Configurar a interface gráfica
+    root = tk.Tk()
+    root.title("Combinar Planilhas Excel")
+
+    frame = tk.Frame(root, padx=20, pady=20)
+    frame.pack(padx=10, pady=10)
+
+    label = tk.Label(frame, text="Selecione o diretório onde estão as planilhas:")
+    label.pack(pady=10)
+
+    button = tk.Button(frame, text="Selecionar Diretório", command=select_directory)
+    button.pack(pady=10)
 
-frame = tk.Frame(root, padx=20, pady=20)
-frame.pack(padx=10, pady=10)
+    parquet_var = tk.BooleanVar(value=False)
+    parquet_check = tk.Checkbutton(frame, text="Saída rápida (Parquet)", variable=parquet_var)
+    parquet_check.pack()
 
-label = tk.Label(frame, text="Selecione o diretório onde estão as planilhas:")
-label.pack(pady=10)
+    text_var = tk.BooleanVar(value=False)
+    text_check = tk.Checkbutton(frame, text="Forçar tipos como texto", variable=text_var)
+    text_check.pack()
 
-button = tk.Button(frame, text="Selecionar Diretório", command=select_directory)
-button.pack(pady=10)
+    columns_label = tk.Label(frame, text="Colunas (opcional, separadas por vírgula):")
+    columns_label.pack(pady=(10, 0))
+    columns_entry = tk.Entry(frame, width=40)
+    columns_entry.pack()
 
-progress_bar = ttk.Progressbar(frame, orient='horizontal', length=300, mode='determinate')
-progress_bar.pack(pady=20)
+    progress_bar = ttk.Progressbar(frame, orient='horizontal', length=300, mode='determinate')
+    progress_bar.pack(pady=20)
 
-root.mainloop()
\ No newline at end of file
+    root.mainloop()